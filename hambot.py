@@ -1,6 +1,7 @@
 import time
 import json
 from turtle import done
+import aiohttp
 import discord
 import logging
 from discord.ext import commands, tasks
@@ -13,7 +14,29 @@ intents = discord.Intents(
     reactions=True
 )
 
-bot = discord.Bot(
+http_timeout = aiohttp.ClientTimeout(total=15, connect=5, sock_read=10)
+
+
+class HamBot(discord.Bot):
+    '''
+    discord.Bot that owns one keep-alive HTTP session for the cogs to share
+    so repeat fetches reuse pooled connections and cached DNS
+    '''
+    http_session = None
+
+    async def start(self, *args, **kwargs):
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300),
+            timeout=http_timeout)
+        await super().start(*args, **kwargs)
+
+    async def close(self):
+        if self.http_session is not None:
+            await self.http_session.close()
+        await super().close()
+
+
+bot = HamBot(
     description="Hambot",
     intents=intents,
 )
@@ -38,7 +61,7 @@ with open('/config/config.json', 'r') as f:
     print('  config loaded.')
 
 bot.owner_id = config['ownerId']
-bot.start_time = time.time()
+bot.start_time = time.monotonic()
 bot.config = config
 
 #Load modules
@@ -19,7 +19,6 @@ from discord.commands import (  # Importing the decorator that makes slash comma
 #import common as cmn
 from onlinelookup import olresult, hamqth, callook, olerror
 import discord
-from datetime import datetime
 
 
 
@@ -41,10 +40,10 @@ class DXCCCog(commands.Cog):
         await ctx.trigger_typing()
         query = query.upper()
         full_query = query
-        embed = discord.Embed(title = "DXCC Info for ", colour=0x31a896, timestamp=datetime.now())
+        embed = discord.Embed(title = "DXCC Info for ", colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.description = f"*Last Updated: {self.cty.formatted_version}*"
         while query:
-            if query in self.cty.keys():
+            if query in self.cty:
                 data = self.cty[query]
                 embed.add_field(name="Entity", value=data["entity"])
                 embed.add_field(name="CQ Zone", value=data["cq"])
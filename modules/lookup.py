@@ -1,24 +1,33 @@
+import asyncio
 import importlib
-import os
+import io
 import time
-from datetime import datetime
+from collections import OrderedDict
 from pathlib import Path
 
 import discord
-import requests
 from ctyparser import BigCty
 from discord.commands import \
     slash_command  # Importing the decorator that makes slash commands.
 from discord.ext import commands, tasks
-from onlinelookup import callook, hamqth, olerror, olresult
+from onlinelookup import callook, hamqth, olerror, olresult, olsession
 
 cty_path = Path("cty.json")
 
+# recently looked up callsigns are kept this long, misses not as long
+call_cache_ttl = 3600
+call_miss_ttl = 5 * 60
+call_cache_size = 512
+
+# kc2g only re-renders its maps every 15 minutes
+map_cache_ttl = 15 * 60
+
 class LookupCog(commands.Cog):
     def __init__(self, bot):
         # reload any changes to the lookup classes
         importlib.reload(olresult)
         importlib.reload(olerror)
+        importlib.reload(olsession)
         importlib.reload(callook)
         importlib.reload(hamqth)
 
@@ -28,100 +37,89 @@ class LookupCog(commands.Cog):
         self.hamqth = hamqth.HamQTHLookup(
             bot.config['hamqth']['username'],
             bot.config['hamqth']['password'])
+        # callsign -> (time fetched, result or None), oldest first
+        self.call_cache = OrderedDict()
+        # map url -> (time rendered, image bytes)
+        self.map_cache = {}
+
+    def cog_unload(self):
+        olsession.close()
 
 
     @slash_command(name="cond", description="Replies with Current Solar Conditions")  
     async def cond(self, ctx):
         await ctx.trigger_typing()
-        # remove possibly conficting old file
-        if os.path.isfile("conditions.jpg"):
-            os.remove("conditions.jpg")
         # download the latest conditions
-        r = requests.get('https://www.hamqsl.com/solar101vhf.php')
-        open('conditions.jpg', 'wb').write(r.content)
-        embed=discord.Embed(title=":sunny: Current Solar Conditions :sunny:",description='Images from https://hamqsl.com', colour=0x31a896, timestamp=datetime.now())
+        content = await self.fetch('https://www.hamqsl.com/solar101vhf.php')
+        embed=discord.Embed(title=":sunny: Current Solar Conditions :sunny:",description='Images from https://hamqsl.com', colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.set_image(url='attachment://conditions.jpg')
-        with open('conditions.jpg', 'rb') as f:
-            #await ctx.send(file=discord.File(f, 'conditions.gif'))
-            await ctx.respond(embed=embed, file=discord.File(f, 'conditions.jpg'))
+        await ctx.respond(embed=embed, file=discord.File(io.BytesIO(content), 'conditions.jpg'))
     
     @slash_command(name="drap", description="D Region Absorption Predictions Map" )
     async def drap(self, ctx):
         await ctx.trigger_typing()
-        # remove possibly conficting old file
-        if os.path.isfile("d-rap.png"):
-            os.remove("d-rap.png")
         # download the latest conditions
-        r = requests.get('https://services.swpc.noaa.gov/images/animations/d-rap/global_f05/d-rap/latest.png')
-        open('d-rap.png', 'wb').write(r.content)
-        embed=discord.Embed(title=":globe_with_meridians: D Region Absorption Predictions Map :globe_with_meridians:",description='Images from https://www.swpc.noaa.gov/', colour=0x31a896, timestamp=datetime.now())
+        content = await self.fetch('https://services.swpc.noaa.gov/images/animations/d-rap/global_f05/d-rap/latest.png')
+        embed=discord.Embed(title=":globe_with_meridians: D Region Absorption Predictions Map :globe_with_meridians:",description='Images from https://www.swpc.noaa.gov/', colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.set_image(url='attachment://d-rap.png')
-        with open('d-rap.png', 'rb') as f:
-            await ctx.respond(embed=embed, file=discord.File(f, 'd-rap.png'))    
+        await ctx.respond(embed=embed, file=discord.File(io.BytesIO(content), 'd-rap.png'))
 
     @slash_command(name="fof2", description="Frequency of F2 Layer Map" )
     async def fof2(self, ctx):
         await ctx.trigger_typing()
         fileName="fof2.jpg"
-        svgName="fof2.svg"
         url="https://prop.kc2g.com/renders/current/fof2-normal-now.svg"
-        embed=discord.Embed(title="Frequency of F2 Layer Map", colour=0x31a896, timestamp=datetime.now())
+        embed=discord.Embed(title="Frequency of F2 Layer Map", colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.set_image(url=f'attachment://{fileName}')
-        #if the muf image already exists and is less than 15 minutes old, send it
-        if os.path.isfile(fileName) and int(time.time()-os.path.getmtime(fileName))/60<15:
-            with open(fileName, 'rb') as f:
-                await ctx.respond(embed=embed, file=discord.File(f, fileName))
-        #if the muf image does not exist or the image is older than 15 minutes, cleanup files and grab a new one
-        elif not os.path.isfile(fileName) or int(time.time()-os.path.getmtime(fileName))/60>=15:
-            if os.path.isfile(fileName):
-                os.remove(fileName)
-            if os.path.isfile(svgName):
-                os.remove(svgName)
-            #download the latest muf map
-            r = requests.get(url)
-            open(svgName, 'wb').write(r.content)
-            #convert svg to jpg
-            convert_svg = os.system(f"rsvg-convert {svgName} > {fileName}")
-            #cleanup svg because we don't need it hanging around once we have a jpg
-            if os.path.isfile(svgName):
-                os.remove(svgName)
-            with open(fileName, 'rb') as f:
-                await ctx.respond(embed=embed, file=discord.File(f, fileName))       
+        image = await self.render_map(url)
+        await ctx.respond(embed=embed, file=discord.File(io.BytesIO(image), fileName))
 
     @slash_command(name="muf", description="Maximum Usable Frequency Map")
     async def muf(self, ctx):
         await ctx.trigger_typing()
         fileName="muf.jpg"
-        svgName="muf.svg"
         url="https://prop.kc2g.com/renders/current/mufd-normal-now.svg"
-        embed=discord.Embed(title="Maximum Usable Frequency Map", colour=0x31a896, timestamp=datetime.now())
+        embed=discord.Embed(title="Maximum Usable Frequency Map", colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.set_image(url=f'attachment://{fileName}')
-        #if the muf image already exists and is less than 15 minutes old, send it
-        if os.path.isfile(fileName) and int(time.time()-os.path.getmtime(fileName))/60<15:
-            with open(fileName, 'rb') as f:
-                await ctx.respond(embed=embed, file=discord.File(f, fileName))
-        #if the muf image does not exist or the image is older than 15 minutes, cleanup files and grab a new one
-        elif not os.path.isfile(fileName) or int(time.time()-os.path.getmtime(fileName))/60>=15:
-            if os.path.isfile(fileName):
-                os.remove(fileName)
-            if os.path.isfile(svgName):
-                os.remove(svgName)
-            #download the latest muf map
-            r = requests.get(url)
-            open(svgName, 'wb').write(r.content)
-            #convert svg to jpg
-            convert_svg = os.system(f"rsvg-convert {svgName} > {fileName}")
-            #cleanup svg because we don't need it hanging around once we have a jpg
-            if os.path.isfile(svgName):
-                os.remove(svgName)
-            with open(fileName, 'rb') as f:
-                await ctx.respond(embed=embed, file=discord.File(f, fileName))
+        image = await self.render_map(url)
+        await ctx.respond(embed=embed, file=discord.File(io.BytesIO(image), fileName))
+
+    async def fetch(self, url):
+        async with self.bot.http_session.get(url) as r:
+            # bail on an error page before pulling its body down
+            r.raise_for_status()
+            return await r.read()
+
+    async def render_map(self, url):
+        '''
+        Download a kc2g svg map and convert it with rsvg-convert over pipes
+        A rendered map is reused until it is map_cache_ttl seconds old,
+        a failed render raises and is never cached
+        '''
+        cached = self.map_cache.get(url)
+        if cached is not None and time.monotonic() - cached[0] < map_cache_ttl:
+            return cached[1]
+
+        svg = await self.fetch(url)
+        proc = await asyncio.create_subprocess_exec(
+            'rsvg-convert',
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE)
+        image, err = await proc.communicate(svg)
+        if proc.returncode != 0:
+            raise RuntimeError(f'rsvg-convert failed on {url} '
+                               f'({proc.returncode}): '
+                               f'{err.decode(errors="replace").strip()}')
+
+        self.map_cache[url] = (time.monotonic(), image)
+        return image
 
     @slash_command(name="call", description="Display information about a callsign")
     async def call(self, ctx, callsign: str):
         await ctx.trigger_typing()
 
-        result = self.lookup(callsign)
+        result = await self.lookup(callsign)
         result_embed_desc = ''
         if result == None:
             await ctx.respond('oof no callsign found', ephemeral=True)
@@ -130,101 +128,99 @@ class LookupCog(commands.Cog):
             result_embed_desc += self.format_for_callook(result)
         elif result.source == 'HamQTH':
             result_embed_desc += self.format_for_hamqth(result)
-        embed=discord.Embed(title=result.callsign,description=result_embed_desc, colour=0x31a896, timestamp=datetime.now())
+        embed=discord.Embed(title=result.callsign,description=result_embed_desc, colour=0x31a896, timestamp=discord.utils.utcnow())
         embed.set_footer(text=f'Source: {result.source}')
         await ctx.respond(embed=embed, ephemeral=True)
 
-    def lookup(self, callsign):
+    async def lookup(self, callsign):
         '''
         Try US callsigns first
         If that fails, try for all calls
+
+        Both lookups block on HTTP, so they run in worker threads side by
+        side and the HamQTH round trip overlaps the Callook one
+
+        Results are cached for call_cache_ttl seconds, calls neither
+        service knows for call_miss_ttl. Service errors aren't cached
         '''
+        key = callsign.upper()
+        cached = self.call_cache.get(key)
+        if cached is not None:
+            ttl = call_cache_ttl if cached[1] is not None else call_miss_ttl
+            if time.monotonic() - cached[0] < ttl:
+                self.call_cache.move_to_end(key)
+                return cached[1]
+
+        callook_task = asyncio.create_task(
+            asyncio.to_thread(self.callook.lookup, callsign))
+        hamqth_task = asyncio.create_task(
+            asyncio.to_thread(self.hamqth.lookup, callsign))
+
         try:
-            result = self.callook.lookup(callsign)
+            result = await callook_task
         except olerror.LookupResultError:
             try:
-                result = self.hamqth.lookup(callsign)
-            except:
+                result = await hamqth_task
+            except olerror.LookupResultError:
+                # not found anywhere, that's worth remembering
+                result = None
+            except Exception:
+                # HamQTH is down or unhappy, ask again next time
                 return None
+        finally:
+            # callook won (or blew up), HamQTH's answer isn't needed
+            hamqth_task.cancel()
 
+        self.remember(key, result)
         return result
 
-    ''' lookup formatting '''
+    def remember(self, key, result):
+        self.call_cache[key] = (time.monotonic(), result)
+        self.call_cache.move_to_end(key)
+        while len(self.call_cache) > call_cache_size:
+            self.call_cache.popitem(last=False)
 
-    def format_for_callook(self, r, hqr=None):
-        rets = ''
-
-        # extra info if neccessary
-        if hqr is not None:
-            itu = hqr.itu
-            cq = hqr.cq
+    ''' lookup formatting '''
 
-        # about field
-        about = ''
-        about += f'\t**Name:** {r.name}\n'
-        if not r.club:
-            about += f'\t**Class:** {r.opclass}\n'
-        if r.prevcall != '':
-            about += f'\t**Previous Callsign:** {r.prevcall}\n'
-
-        # location field
-        loc = ''
-        loc += f'\t**Country:** {r.country}\n'
-        loc += f'\t**Grid Square:** {r.grid}\n'
-        loc += f'\t**State:** {r.state}\n'
-        loc += f'\t**City:** {r.city}\n'
-
-        # club field
-        club = ''
-        if r.club:
-            club = '**Club Info**\n'
-            club += f'\t**Trustee:** {r.trusteename} ({r.trusteecall})\n\n'
-
-        # links
-        links = ''
-        links += f'\t**QRZ:** https://qrz.com/db/{r.callsign}\n'
-        links += f'\t**ULS:** {r.uls}\n'
-
-        # build magical string
-        rets = ('**About**\n'
-                f'{about}'
+    def format_for_callook(self, r):
+        # optional lines
+        opclass = '' if r.club else f'\t**Class:** {r.opclass}\n'
+        prevcall = (f'\t**Previous Callsign:** {r.prevcall}\n'
+                    if r.prevcall != '' else '')
+        club = ('**Club Info**\n'
+                f'\t**Trustee:** {r.trusteename} ({r.trusteecall})\n\n'
+                if r.club else '')
+
+        # build magical string in one go
+        return ('**About**\n'
+                f'\t**Name:** {r.name}\n'
+                f'{opclass}'
+                f'{prevcall}'
                 '\n**Location**\n'
-                f'{loc}'
+                f'\t**Country:** {r.country}\n'
+                f'\t**Grid Square:** {r.grid}\n'
+                f'\t**State:** {r.state}\n'
+                f'\t**City:** {r.city}\n'
                 '\n'
                 f'{club}'
                 '**Links**\n'
-                f'{links}')
-
-        return rets
-
-        em = discord.Embed(title=r.callsign, url=f'https://qrz.com/db/{r.callsign}', description=rets, colour=0x00c0ff)
-        em = em.set_footer(text='Source: callook.info')
-
-        # return
-        return em
+                f'\t**QRZ:** https://qrz.com/db/{r.callsign}\n'
+                f'\t**ULS:** {r.uls}\n')
 
     def format_for_hamqth(self, r):
-        rets = ''
-
         # about field
         if r.name != '':
-            rets = r.name
+            name = r.name
         elif 'nick' in r.raw:
-            rets = r.raw['nick']
+            name = r.raw['nick']
         else:
-            rets = 'no name given'
-
-        rets = f'**About**\n\t**Name:** {rets}\n\n'
-
-        # location
-        rets += f'**Location**\n\t**Country:** {r.country}\n'
-        rets += f'\t**Grid Square:** {r.grid}\n'
-        rets += f'\t**City:** {r.city}\n\n'
-
-        # links
-        rets += f'**Links**\n\t**QRZ:** https://qrz.com/db/{r.callsign}\n'
+            name = 'no name given'
 
-        return rets
+        return (f'**About**\n\t**Name:** {name}\n\n'
+                f'**Location**\n\t**Country:** {r.country}\n'
+                f'\t**Grid Square:** {r.grid}\n'
+                f'\t**City:** {r.city}\n\n'
+                f'**Links**\n\t**QRZ:** https://qrz.com/db/{r.callsign}\n')
 
 def setup(bot):
     bot.add_cog(LookupCog(bot))
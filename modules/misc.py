@@ -1,7 +1,7 @@
 import time
 import discord
 from discord.ext import commands
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from discord.commands import (  # Importing the decorator that makes slash commands.
     slash_command,
 )
@@ -13,22 +13,78 @@ TODO:
 '''
 
 
+# (unit, seconds) pairs used to break down uptime, largest first
+uptime_units = (('day', 86400), ('hour', 3600), ('minute', 60))
+
+
+def plural(count, unit):
+    # appeases my awful need for proper plurality
+    return f'{count} {unit}' if count == 1 else f'{count} {unit}s'
+
+
+def format_uptime(remaining):
+    '''
+    Turns a whole number of seconds into "N days, N hours, N minutes,
+    N seconds" with plain integer math
+    '''
+    parts = []
+    for unit, size in uptime_units:
+        count, remaining = divmod(remaining, size)
+        parts.append(plural(count, unit))
+    parts.append(plural(remaining, 'second'))
+
+    return ', '.join(parts)
+
+
 class MiscCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.embed_service = bot.get_cog('EmbedCog')
+        # (uptime in whole seconds, formatted string)
+        self.uptime_cache = (-1, '')
+
+        # these never change, so build the whole reply once instead of
+        # per command and just unpack it into ctx.respond
+        self.help_reply = {
+            'embed': self.embed_service.generate(
+                title="Help",
+                description=help_message
+            ),
+            'ephemeral': True
+        }
+        self.testing_reply = {
+            'embed': self.embed_service.generate(
+                title="Taking your ham license test with HRCC",
+                description=hb_testing
+            ),
+            'ephemeral': False
+        }
+        self.hamlive_reply = {
+            'embed': self.embed_service.generate(
+                title="Ham.Live",
+                description=hamlive_text
+            ),
+            'ephemeral': True
+        }
+        study_embed = discord.Embed(title="Study using the Ham.Study app or Website",description=study_text, colour=0x31a896)
+        study_embed.set_image(url='https://blog.hamstudy.org/wp-content/uploads/2013/10/hamstudy_blue.png')
+        self.study_reply = {'embed': study_embed}
+
+        # /about only swaps in a fresh uptime on a copy of this
+        self.about_embed = self.embed_service.generate(
+            title="Help",
+            footer='hambot 2.1 by N4OG\n'
+                   '\tbased on HamTheMan by thisguyistotallyben'
+        )
 
     @slash_command(name="utc", description="Replies with Universal Coordinated Time")
     async def utc(self, ctx):
-        full_time = str(datetime.utcnow())
-        full_time_split = full_time.strip().split()
-        date = full_time_split[0]
-        time = full_time_split[1][0:8]
+        now = datetime.now(timezone.utc)
 
         await ctx.respond(embed=self.embed_service
             .generate(
                 title='Universal Coordinated Time',
-                description=f'**Date:** {date}\n**Time:** {time}'
+                description=now.strftime('**Date:** %Y-%m-%d\n**Time:** %H:%M:%S')
             ), ephemeral=True
         )
 
@@ -38,79 +94,37 @@ class MiscCog(commands.Cog):
 
     @slash_command(name="help", description="hambot help")
     async def help(self, ctx):
-        await ctx.respond(embed=self.embed_service
-            .generate(
-                title="Help",
-                description=help_message
-            ), ephemeral=True
-        )
+        await ctx.respond(**self.help_reply)
 
     @slash_command(name="about", description="hambot about")
     async def about(self, ctx):
-        await ctx.respond(embed=self.embed_service
-            .generate(
-                title="Help",
-                description=hb_about + self.calc_uptime(),
-                footer='hambot 2.1 by N4OG\n'
-                       '\tbased on HamTheMan by thisguyistotallyben'
-            ), ephemeral=True
-        )
+        embed = self.about_embed.copy()
+        embed.description = f'{hb_about}{self.calc_uptime()}'
+        await ctx.respond(embed=embed, ephemeral=True)
 
     @slash_command(name="study", description="License Study Information")
     async def study(self, ctx):
-        embed=discord.Embed(title="Study using the Ham.Study app or Website",description=study_text, colour=0x31a896, timestamp=datetime.now())
-        embed.set_image(url='https://blog.hamstudy.org/wp-content/uploads/2013/10/hamstudy_blue.png')
-        await ctx.respond(embed=embed)
+        await ctx.respond(**self.study_reply)
 
     @slash_command(name="testing", description="License Testing Information")
     async def testing(self, ctx):
-        await ctx.respond(embed=self.embed_service
-                .generate(
-                    title="Taking your ham license test with HRCC",
-                    description=hb_testing
-                    ), ephemeral=False
-                )
+        await ctx.respond(**self.testing_reply)
+
     @slash_command(name="hamlive", description="Ham.Live Net Information")
-    async def hamlive(self,ctx):
-            await ctx.respond(embed=self.embed_service
-                .generate(
-                    title="Ham.Live",
-                    description=hamlive_text
-                    ), ephemeral=True
-                )
+    async def hamlive(self, ctx):
+        await ctx.respond(**self.hamlive_reply)
 
     def calc_uptime(self):
-        up = str(timedelta(seconds=(time.time() - self.bot.start_time)))
-
-        # parse it pretty-like
-        upsplit = up.split(',', 1)
-        if len(upsplit) == 1:
-            days = '0'
-        else:
-            days = upsplit[0].split()[0]
-            upsplit[0] = upsplit[1]
-
-        upsplit = upsplit[0].split(':')
-        if len(upsplit) != 3:
-            return ''
-
-        hours = upsplit[0]
-        minutes = upsplit[1]
-        if minutes[0] == '0':
-            minutes = minutes[1]
-        seconds = upsplit[2].split('.', 1)[0]
-        if seconds[0] == '0':
-            seconds = seconds[1]
-
-        # horribly complicated, but appeases my awful need for proper plurality
-
-        rets = ''
-        rets += f"{days} day{'' if days == '1' else 's'}, "
-        rets += f"{hours} hour{'' if hours == '1' else 's'}, "
-        rets += f"{minutes} minute{'' if minutes == '1' else 's'}, "
-        rets += f"{seconds} second{'' if seconds == '1' else 's'}"
-
-        return rets
+        # bursts of /uptime and /about land in the same second, so only
+        # the first one pays for formatting
+        seconds = int(time.monotonic() - self.bot.start_time)
+        cached_seconds, cached = self.uptime_cache
+        if cached_seconds == seconds:
+            return cached
+
+        formatted = format_uptime(seconds)
+        self.uptime_cache = (seconds, formatted)
+        return formatted
 
 
 def setup(bot):
@@ -12,6 +12,8 @@ statuses = [    '7.200',
 class StatusCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.random = random.Random()
+        self.last_status = None
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -19,7 +21,11 @@ class StatusCog(commands.Cog):
     
     @tasks.loop(minutes=10)
     async def status_change(self): 
-        botStatus = random.choice(statuses)
+        botStatus = self.random.choice(statuses)
+        # same frequency as last time, no need to bother the gateway
+        if botStatus == self.last_status:
+            return
+        self.last_status = botStatus
         await self.bot.change_presence(activity=discord.Activity(type=discord.ActivityType.listening, name=botStatus))
 
 
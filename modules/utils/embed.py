@@ -5,6 +5,8 @@ from discord.ext import commands
 class EmbedCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # already parsed from hex in hambot.py, resolve it once here
+        self.colour = bot.config['embedcolor']
 
     def generate(self, **kwargs):
         title = ''
@@ -21,7 +23,7 @@ class EmbedCog(commands.Cog):
         return discord.Embed(
             title=title,
             description=description,
-            colour=self.bot.config['embedcolor']
+            colour=self.colour
         ).set_footer(text=footer)
 
 
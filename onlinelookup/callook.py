@@ -6,27 +6,15 @@ Uses Callook's API to retreive information on callsigns
 """
 
 
-import json
 import os.path
-from urllib import request, error
-from . import olerror, olresult
+from . import olerror, olresult, olsession
 
 # importorator
 __all__ = ['CallookLookup']
 
 
 def prettify(name):
-    names = name.split()
-    newname = ''
-
-    for i in names:
-        if len(name) > 1:
-            newname += i[0] + i[1:].lower()
-        else:
-            newname += i
-        newname += ' '
-
-    return newname
+    return ' '.join(i[:1] + i[1:].lower() for i in name.split())
 
 
 # hamqth lookup class
@@ -46,8 +34,9 @@ class CallookLookup:
         # make request
         req = (f'https://callook.info/{call}/json')
 
-        with request.urlopen(req) as url:
-            data = json.loads(url.read().decode())
+        with olsession.session().get(req, timeout=olsession.timeout) as resp:
+            resp.raise_for_status()
+            data = resp.json()
 
         # check if callsign or not
         if data['status'] == 'INVALID':
@@ -1,7 +1,5 @@
-import json
 import os.path
-from urllib import request, error
-import olerror, olresult
+import olerror, olresult, olsession
 
 
 # importorator
@@ -24,8 +22,9 @@ class ExamToolsLookup:
         # make request
         req = (f'https://exam.tools/api/uls/individual/{call}')
 
-        with request.urlopen(req) as url:
-            data = json.loads(url.read().decode())
+        with olsession.session().get(req, timeout=olsession.timeout) as resp:
+            resp.raise_for_status()
+            data = resp.json()
 
         # check if callsign or not
         if 'type' in data:
@@ -7,9 +7,9 @@ Uses HamQTH's API to retreive information on callsigns
 
 
 import os.path
-from urllib import request, error
+import threading
 import xml.etree.ElementTree as et
-from . import olerror, olresult
+from . import olerror, olresult, olsession
 
 
 # importorator
@@ -18,6 +18,29 @@ __all__ = ['HamQTHLookup']
 # key file location
 key_file = 'hamqth_key.txt'
 
+# namespaced tags HamQTH answers with
+namespace = '{https://www.hamqth.com}'
+session_tag = namespace + 'session'
+session_id_tag = namespace + 'session_id'
+error_tag = namespace + 'error'
+search_tag = namespace + 'search'
+
+# HamQTH tag -> (LookupResult attribute, optional transform)
+field_map = {
+    'callsign': ('callsign', str.upper),
+    'adr_name': ('name', None),
+    'adr_street1': ('street1', None),
+    'adr_street2': ('street2', None),
+    'adr_city': ('city', None),
+    'us_state': ('state', None),
+    'adr_zip': ('zip', None),
+    'country': ('country', None),
+    # 'qth': ('qth', None),
+    'itu': ('itu', None),
+    'cq': ('cq', None),
+    'grid': ('grid', None),
+}
+
 
 # hamqth lookup class
 class HamQTHLookup:
@@ -25,9 +48,10 @@ class HamQTHLookup:
         self.username = username
         self.password = password
         self.key = None
+        # lookups run on several threads, only one of them renews the key
+        self.key_lock = threading.Lock()
 
         self.active = False
-        self.prefix = "{https://www.hamqth.com}"
 
         self.connect()
 
@@ -50,40 +74,48 @@ class HamQTHLookup:
         else:
             self.get_key()
 
-    def get_key(self):
+    def get_key(self, stale=None):
         """
         Gets and sets a HamQTH API key when starting and when the key expires
         Uses already set login credentials
         Note: This key is good for one hour
 
+        :param stale: the expired key, if another thread already replaced
+            it then that new key is used and no login is made
         raises LookupVerificationError: If login is bad
         """
-        # make request
-        req = (f'https://www.hamqth.com/xml.php'
-               f'?u={self.username}'
-               f'&p={self.password}')
-
-        # get XML data
-        data = et.parse(request.urlopen(req))
-        root = data.getroot()
-
-        # pass
-        if root[0][0].tag == self.prefix + "session_id":
-            self.active = True
-            self.key = root[0][0].text
-
-            # write to a file
-            with open(key_file, 'w') as f:
-                f.write(self.key)
-                f.close()
-
-        # fail
-        elif root[0][0].tag == self.prefix + "error":
-            raise olerror.LookupVerificationError('HamQTH')
-
-        # catastrophic failure
-        else:
-            raise olerror.LookupVerificationError('HamQTH')
+        with self.key_lock:
+            if stale is not None and self.key != stale:
+                return
+
+            # make request
+            req = (f'https://www.hamqth.com/xml.php'
+                   f'?u={self.username}'
+                   f'&p={self.password}')
+
+            # get XML data
+            with olsession.session().get(req,
+                                         timeout=olsession.timeout) as resp:
+                resp.raise_for_status()
+                root = et.fromstring(resp.content)
+
+            # pass
+            if root[0][0].tag == session_id_tag:
+                self.active = True
+                self.key = root[0][0].text
+
+                # write to a file
+                with open(key_file, 'w') as f:
+                    f.write(self.key)
+                    f.close()
+
+            # fail
+            elif root[0][0].tag == error_tag:
+                raise olerror.LookupVerificationError('HamQTH')
+
+            # catastrophic failure
+            else:
+                raise olerror.LookupVerificationError('HamQTH')
 
     def lookup(self, call, retry=True):
         """
@@ -101,75 +133,57 @@ class HamQTHLookup:
         if not self.active:
             raise olerror.LookupActiveError('HamQTH')
 
-        # setup
-        lr = olresult.LookupResult()
-        retdict = {}
-
-        # make request
-        req = (f'https://www.hamqth.com/xml.php'
-               f'?id={self.key}'
-               f'&callsign={call}'
-               f'&prg=YARL')
-
-        # get the goods
-        data = et.parse(request.urlopen(req))
-        root = data.getroot()
+        # at most one more go after renewing an expired key
+        for _ in range(2 if retry else 1):
+            # make request
+            key = self.key
+            req = (f'https://www.hamqth.com/xml.php'
+                   f'?id={key}'
+                   f'&callsign={call}'
+                   f'&prg=YARL')
+
+            # get the goods
+            with olsession.session().get(req,
+                                         timeout=olsession.timeout) as resp:
+                resp.raise_for_status()
+                root = et.fromstring(resp.content)
+
+            # bad key, renew it and go around again if we still can
+            if (root[0].tag == session_tag
+                    and root[0][0].text == 'Session does not exist or expired'):
+                self.get_key(stale=key)
+                continue
+
+            break
+        else:
+            raise olerror.LookupVerificationError('HamQTH')
 
         # failure
-        if root[0].tag == self.prefix + "session":
-            # get failure cause
-            errmess = root[0][0].text
-
-            # bad key
-            if errmess == 'Session does not exist or expired':
-                self.get_key()
-                if retry:
-                    return self.lookup(call, False)
-                else:
-                    raise olerror.LookupVerificationError('HamQTH')
-
+        if root[0].tag == session_tag:
             # no call found
-            elif errmess == 'Callsign not found':
+            if root[0][0].text == 'Callsign not found':
                 raise olerror.LookupResultError('HamQTH')
 
         # callsign found
-        elif root[0].tag == self.prefix + "search":
-            lr.source = 'HamQTH'
+        elif root[0].tag == search_tag:
+            fields = {}
+            retdict = {}
 
             for t in root[0]:
-                key = t.tag[len(self.prefix):]
+                # strip the namespace, tag or no tag
+                key = t.tag.rpartition('}')[2]
                 value = t.text
 
                 # info filling
-                if key == 'callsign':
-                    lr.callsign = value.upper()
-                elif key == 'adr_name':
-                    lr.name = value
-                elif key == 'adr_street1':
-                    lr.street1 = value
-                elif key == 'adr_street2':
-                    lr.street2 = value
-                elif key == 'adr_city':
-                    lr.city = value
-                elif key == 'us_state':
-                    lr.state = value
-                elif key == 'adr_zip':
-                    lr.zip = value
-                elif key == 'country':
-                    lr.country = value
-                # elif key == 'qth':
-                #     lr.qth = value
-                elif key == 'itu':
-                    lr.itu = value
-                elif key == 'cq':
-                    lr.cq = value
-                elif key == 'grid':
-                    lr.grid = value
+                field = field_map.get(key)
+                if field is not None:
+                    attr, transform = field
+                    fields[attr] = transform(value) if transform else value
 
                 # set raw data for extra whatever
                 if key is not None and value is not None:
                     retdict[key] = value
 
-            # set raw data and return
-            lr.raw = retdict
-            return lr
+            # build the result in one go, untouched fields keep defaults
+            return olresult.LookupResult(source='HamQTH', raw=retdict,
+                                         **fields)
@@ -16,23 +16,32 @@ __all__ = ['OnlineLookupError', 'LookupVerificationError',
 
 # base exception
 class OnlineLookupError(LookupError):
+    # api lives in a slot so raising doesn't build an instance dict
+    __slots__ = ('api',)
+
     def __init__(self, api):
         self.api = api
 
 
 # verification error
 class LookupVerificationError(OnlineLookupError):
+    __slots__ = ()
+
     def __init__(self, api):
         super().__init__(api)
 
 
 # result error
 class LookupResultError(OnlineLookupError):
+    __slots__ = ()
+
     def __init__(self, api):
         super().__init__(api)
 
 
 # inactive error
 class LookupActiveError(OnlineLookupError):
+    __slots__ = ()
+
     def __init__(self, api):
         super().__init__(api)
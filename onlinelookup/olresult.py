@@ -1,36 +1,39 @@
+from dataclasses import dataclass, field
+
+
 # return class
+@dataclass(slots=True)
 class LookupResult:
-    def __init__(self):
-        # basic info
-        self.callsign = ''
-        self.prevcall = ''
-        self.opclass = ''
-        self.name = ''
-
-        # location
-        self.country = ''
-        self.grid = ''
-        self.itu = ''
-        self.cq = ''
-        self.zip = ''
-        self.state = ''
-        self.city = ''
-
-        # club stuff
-        self.club = False
-        self.trusteename = ''
-        self.trusteecall = ''
-
-        # other info
-        self.street1 = ''
-        self.street2 = ''
-
-        # ULS stuff
-        self.frn = ''
-        self.uls = ''
-
-        # raw data
-        self.raw = {}
-
-        # source
-        self.source = ''
+    # basic info
+    callsign: str = ''
+    prevcall: str = ''
+    opclass: str = ''
+    name: str = ''
+
+    # location
+    country: str = ''
+    grid: str = ''
+    itu: str = ''
+    cq: str = ''
+    zip: str = ''
+    state: str = ''
+    city: str = ''
+
+    # club stuff
+    club: bool = False
+    trusteename: str = ''
+    trusteecall: str = ''
+
+    # other info
+    street1: str = ''
+    street2: str = ''
+
+    # ULS stuff
+    frn: str = ''
+    uls: str = ''
+
+    # raw data
+    raw: dict = field(default_factory=dict)
+
+    # source
+    source: str = ''
@@ -0,0 +1,46 @@
+"""
+Online Lookup HTTP sessions
+
+Lookups run in asyncio.to_thread workers, several at a time, and a
+requests.Session isn't promised to be thread safe. So every worker
+thread gets its own keep-alive session from session(), kept and reused
+across lookups instead of each lookup class holding one
+"""
+
+
+import threading
+
+import requests
+
+
+# importorator
+__all__ = ['session', 'timeout', 'close']
+
+
+# (connect, read) seconds, requests has no session-wide default
+timeout = (5, 10)
+
+_local = threading.local()
+_sessions = []
+_sessions_lock = threading.Lock()
+
+
+def session():
+    """
+    Returns the calling thread's session, making it on first use
+    """
+    s = getattr(_local, 'session', None)
+    if s is None:
+        s = _local.session = requests.Session()
+        with _sessions_lock:
+            _sessions.append(s)
+    return s
+
+
+def close():
+    """
+    Drops every pooled connection, the sessions themselves stay usable
+    """
+    with _sessions_lock:
+        for s in _sessions:
+            s.close()